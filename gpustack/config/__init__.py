@@ -1,4 +1,4 @@
-from .config import Config
+from .config import Config, ConfigError
 
 
-__all__ = ["Config"]
+__all__ = ["Config", "ConfigError"]
@@ -1,8 +1,9 @@
 import os
 import secrets
-from typing import List, Optional
-from pydantic import model_validator
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from typing import List, Optional, Set
+from pydantic import ValidationInfo, field_validator, model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from gpustack.utils import validators
 from gpustack.schemas.workers import (
     CPUInfo,
@@ -25,6 +26,60 @@ from gpustack.utils.platform import DeviceTypeEnum, device_type_from_vendor
 _config = None
 
 
+class ConfigError(Exception):
+    pass
+
+
+_VALID_VENDORS = frozenset(v.value for v in VendorEnum)
+_VALID_DEVICE_TYPES = frozenset(t.value for t in DeviceTypeEnum)
+
+
+_INVALID_URL_MESSAGES = {
+    "server_url": "Invalid server URL.",
+    "ollama_library_base_url": "Invalid Ollama library base URL.",
+}
+
+
+def _skip_validation() -> bool:
+    # Skip validation during tests
+    return 'PYTEST_CURRENT_TEST' in os.environ
+
+
+def _read_secret_file(path: str) -> str:
+    with open(path, "r") as file:
+        content = file.read().strip()
+    if not content:
+        raise ConfigError(f"Secret file {path} is empty")
+    return content
+
+
+def _write_secret_file(path: str, content: str, mode: int = 0o666) -> bool:
+    """Create a secret file with its full content in one step.
+
+    The content is written to a temporary file in the same directory, which
+    is then linked into place, so other processes never see a partial file.
+    Returns False without writing if the file already exists, e.g. when
+    another process created it after data_dir was listed.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        # Left behind by an earlier process with the same pid.
+        os.remove(tmp_path)
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+    try:
+        try:
+            os.write(fd, content.encode())
+        finally:
+            os.close(fd)
+        # Unlike rename, link refuses to replace an existing file.
+        os.link(tmp_path, path)
+    except FileExistsError:
+        return False
+    finally:
+        os.remove(tmp_path)
+    return True
+
+
 class Config(BaseSettings):
     """A class used to define GPUStack configuration.
 
@@ -149,25 +204,22 @@ class Config(BaseSettings):
             self.data_dir = os.path.abspath(self.data_dir)
 
         if self.cache_dir is None:
-            self.cache_dir = os.path.join(self.data_dir, "cache")
+            self.cache_dir = f"{self.data_dir}{os.sep}cache"
         else:
             self.cache_dir = os.path.abspath(self.cache_dir)
 
         if self.bin_dir is None:
-            self.bin_dir = os.path.join(self.data_dir, "bin")
+            self.bin_dir = f"{self.data_dir}{os.sep}bin"
         else:
             self.bin_dir = os.path.abspath(self.bin_dir)
 
         if self.log_dir is None:
-            self.log_dir = os.path.join(self.data_dir, "log")
+            self.log_dir = f"{self.data_dir}{os.sep}log"
         else:
             self.log_dir = os.path.abspath(self.log_dir)
 
         if not self._is_server() and not self.token:
-            raise Exception("Token is required when running as a worker")
-
-        self.prepare_token()
-        self.prepare_jwt_secret_key()
+            raise ConfigError("Token is required when running as a worker")
 
         # server options
         self.init_database_url()
@@ -177,31 +229,49 @@ class Config(BaseSettings):
 
         self.make_dirs()
 
+        if self._is_server():
+            # Only the server consumes the token and JWT secret files, so
+            # workers skip the stat/read of both.
+            data_dir_files = {entry.name for entry in os.scandir(self.data_dir)}
+            new_token = new_jwt_secret_key = None
+            if (
+                self.token is None
+                and self.jwt_secret_key is None
+                and not {"token", "jwt_secret_key"} & data_dir_files
+            ):
+                # First run: draw the random bytes for both secrets at once.
+                secret_bytes = secrets.token_bytes(48)
+                new_token = secret_bytes[:16].hex()
+                new_jwt_secret_key = secret_bytes[16:].hex()
+            self.prepare_token(data_dir_files, new_token)
+            self.prepare_jwt_secret_key(data_dir_files, new_jwt_secret_key)
+
+    @field_validator("server_url", "ollama_library_base_url")
+    def check_url(cls, value, info: ValidationInfo):
+        if not value or _skip_validation():
+            return value
+
+        if value.endswith("/"):
+            value = value.rstrip("/")
+        if validators.url(value) is not True:
+            raise ConfigError(_INVALID_URL_MESSAGES[info.field_name])
+        return value
+
     @model_validator(mode="after")
-    def check_all(self):  # noqa: C901
-        if 'PYTEST_CURRENT_TEST' in os.environ:
-            # Skip validation during tests
+    def check_all(self):
+        if _skip_validation():
             return self
 
         if (self.ssl_keyfile and not self.ssl_certfile) or (
             self.ssl_certfile and not self.ssl_keyfile
         ):
-            raise Exception(
+            raise ConfigError(
                 'Both "ssl_keyfile" and "ssl_certfile" must be provided, or neither.'
             )
 
-        if self.server_url:
-            self.server_url = self.server_url.rstrip("/")
-            if validators.url(self.server_url) is not True:
-                raise Exception("Invalid server URL.")
-
-        if self.ollama_library_base_url:
-            self.ollama_library_base_url = self.ollama_library_base_url.rstrip("/")
-            if validators.url(self.ollama_library_base_url) is not True:
-                raise Exception("Invalid Ollama library base URL.")
-
         if self.resources:
-            self.get_gpu_devices()
+            if self.resources.get("gpu_devices"):
+                self.get_gpu_devices()
             self.get_system_info()
 
         if self.enable_ray:
@@ -221,16 +291,16 @@ class Config(BaseSettings):
     def check_ray(self):
         system = platform.system()
         if system != "linux":
-            raise Exception("Ray is only supported on Linux.")
+            raise ConfigError("Ray is only supported on Linux.")
 
     def check_port_range(self, port_range: str):
         ports = port_range.split("-")
         if len(ports) != 2:
-            raise Exception(f"Invalid port range: {port_range}")
+            raise ConfigError(f"Invalid port range: {port_range}")
         if not ports[0].isdigit() or not ports[1].isdigit():
-            raise Exception("Port range must be numeric")
+            raise ConfigError("Port range must be numeric")
         if int(ports[0]) > int(ports[1]):
-            raise Exception(f"Invalid port range: {ports[0]} > {ports[1]}")
+            raise ConfigError(f"Invalid port range: {ports[0]} > {ports[1]}")
 
     def make_dirs(self):
         os.makedirs(self.data_dir, exist_ok=True)
@@ -293,13 +363,13 @@ class Config(BaseSettings):
                 mount_from = fs.get("mount_from")
                 total = fs.get("total")
                 if not name:
-                    raise Exception("Filesystem name is required")
+                    raise ConfigError("Filesystem name is required")
                 if not mount_point:
-                    raise Exception("Filesystem mount_point is required")
+                    raise ConfigError("Filesystem mount_point is required")
                 if not mount_from:
-                    raise Exception("Filesystem mount_from is required")
+                    raise ConfigError("Filesystem mount_from is required")
                 if total is None:
-                    raise Exception("Filesystem total is required")
+                    raise ConfigError("Filesystem total is required")
                 filesystem.append(
                     MountPoint(
                         name=name,
@@ -315,9 +385,9 @@ class Config(BaseSettings):
             name = os_dict.get("name")
             version = os_dict.get("version")
             if not name:
-                raise Exception("OS name is required")
+                raise ConfigError("OS name is required")
             if not version:
-                raise Exception("OS version is required")
+                raise ConfigError("OS version is required")
             system_info.os = OperatingSystemInfo(name=name, version=version)
 
         kernel_dict = self.resources.get("kernel")
@@ -327,11 +397,11 @@ class Config(BaseSettings):
             version = kernel_dict.get("version")
             architecture = kernel_dict.get("architecture")
             if not name:
-                raise Exception("Kernel name is required")
+                raise ConfigError("Kernel name is required")
             if not release:
-                raise Exception("Kernel release is required")
+                raise ConfigError("Kernel release is required")
             if not version:
-                raise Exception("Kernel version is required")
+                raise ConfigError("Kernel version is required")
             system_info.kernel = KernelInfo(
                 name=name, release=release, version=version, architecture=architecture
             )
@@ -341,9 +411,9 @@ class Config(BaseSettings):
             uptime = uptime_dict.get("uptime")
             boot_time = uptime_dict.get("boot_time")
             if uptime is None:
-                raise Exception("Uptime is required")
+                raise ConfigError("Uptime is required")
             if not boot_time:
-                raise Exception("Boot time is required")
+                raise ConfigError("Boot time is required")
             system_info.uptime = UptimeInfo(uptime=uptime, boot_time=boot_time)
 
         if not any(
@@ -361,7 +431,7 @@ class Config(BaseSettings):
 
         return system_info
 
-    def get_gpu_devices(self) -> GPUDevicesInfo:  # noqa: C901
+    def get_gpu_devices(self) -> GPUDevicesInfo:
         """get gpu devices from resources
         resource example:
         ```yaml
@@ -397,91 +467,14 @@ class Config(BaseSettings):
                   mtu: 8192                # optional
         ```
         """
-        gpu_devices: GPUDevicesInfo = []
         if not self.resources:
             return None
 
-        gpu_device_dict = self.resources.get("gpu_devices")
-        if not gpu_device_dict:
+        gpu_device_list = self.resources.get("gpu_devices")
+        if not gpu_device_list:
             return None
 
-        for gd in gpu_device_dict:
-            name = gd.get("name")
-            index = gd.get("index")
-            device_index = gd.get("device_index", index)
-            device_chip_index = gd.get("device_chip_index", 0)
-            vendor = gd.get("vendor")
-            memory = gd.get("memory")
-            network = gd.get("network")
-            type = gd.get("type") or device_type_from_vendor(vendor)
-
-            if not name:
-                raise Exception("GPU device name is required")
-
-            if index is None:
-                raise Exception("GPU device index is required")
-
-            if vendor not in VendorEnum.__members__.values():
-                raise Exception(
-                    "Unsupported GPU device vendor, supported vendors are: Apple, NVIDIA, 'Moore Threads', Huawei, AMD, Hygon, Iluvatar, Cambricon"
-                )
-
-            if not memory:
-                raise Exception("GPU device memory is required")
-            elif not memory.get("total"):
-                raise Exception("GPU device memory total is required")
-
-            if network:
-                network_status = network.get("status", "up")
-                if network_status not in ["up", "down"]:
-                    raise Exception(
-                        "GPU device network status is invalid, supported status are: up, down"
-                    )
-                network_inet = network.get("inet", None)
-                if network_inet is None:
-                    raise Exception("GPU device network inet is required")
-                elif not validators.ip(network_inet):
-                    raise Exception("GPU device network inet is invalid")
-                network_netmask = network.get("netmask", None)
-                if network_netmask and not validators.ip(network_netmask):
-                    raise Exception("GPU device network netmask is invalid")
-                gateway = network.get("gateway", None)
-                if gateway and not validators.ip(gateway):
-                    raise Exception("GPU device network gateway is invalid")
-
-            if type not in DeviceTypeEnum.__members__.values():
-                raise Exception(
-                    "Unsupported GPU type, supported type are: cuda, musa, npu, mps, rocm, dcu, corex, mlu"
-                )
-
-            gpu_devices.append(
-                GPUDeviceInfo(
-                    index=index,
-                    device_index=device_index,
-                    device_chip_index=device_chip_index,
-                    name=name,
-                    vendor=vendor,
-                    memory=MemoryInfo(
-                        total=memory.get("total"),
-                        is_unified_memory=memory.get("is_unified_memory", False),
-                    ),
-                    network=(
-                        None
-                        if not network
-                        else GPUNetworkInfo(
-                            status=network.get("status", "up"),
-                            inet=network.get("inet"),
-                            netmask=network.get("netmask", ""),
-                            mac=network.get("mac", ""),
-                            gateway=network.get("gateway", ""),
-                            iface=network.get("iface", None),
-                            mtu=network.get("mtu", None),
-                        )
-                    ),
-                    type=type,
-                )
-            )
-
+        gpu_devices: GPUDevicesInfo = [_parse_gpu_device(gd) for gd in gpu_device_list]
         return gpu_devices
 
     def init_database_url(self):
@@ -489,60 +482,56 @@ class Config(BaseSettings):
             self.database_url = f"sqlite:///{self.data_dir}/database.db"
             return
 
-        if (
-            not self.database_url.startswith("sqlite://")
-            and not self.database_url.startswith("postgresql://")
-            and not self.database_url.startswith("mysql://")
-        ):
-            raise Exception(
+        if not self.database_url.startswith(("sqlite://", "postgresql://", "mysql://")):
+            raise ConfigError(
                 "Unsupported database scheme. Supported databases are sqlite, postgresql, and mysql."
             )
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def get_data_dir():
         app_name = "gpustack"
         if os.name == "nt":  # Windows
-            data_dir = os.path.join(os.environ["APPDATA"], app_name)
+            # APPDATA is already absolute, only normalize it.
+            return os.path.normpath(os.path.join(os.environ["APPDATA"], app_name))
         elif os.name == "posix":
-            data_dir = f"/var/lib/{app_name}"
+            return f"/var/lib/{app_name}"
         else:
-            raise Exception("Unsupported OS")
-
-        return os.path.abspath(data_dir)
+            raise ConfigError("Unsupported OS")
 
-    class Config:
-        env_prefix = "GPU_STACK_"
-        protected_namespaces = ('settings_',)
+    model_config = SettingsConfigDict(
+        env_prefix="GPU_STACK_",
+        protected_namespaces=('settings_',),
+    )
 
-    def prepare_token(self):
+    def prepare_token(self, data_dir_files: Set[str], new_token: Optional[str] = None):
         if self.token is not None:
             return
 
         token_path = os.path.join(self.data_dir, "token")
-        if os.path.exists(token_path):
-            with open(token_path, "r") as file:
-                token = file.read().strip()
+        if "token" in data_dir_files:
+            token = _read_secret_file(token_path)
         else:
-            token = secrets.token_hex(16)
-            os.makedirs(self.data_dir, exist_ok=True)
-            with open(token_path, "w") as file:
-                file.write(token + "\n")
+            token = new_token or secrets.token_hex(16)
+            if not _write_secret_file(token_path, token + "\n"):
+                token = _read_secret_file(token_path)
 
         self.token = token
 
-    def prepare_jwt_secret_key(self):
+    def prepare_jwt_secret_key(
+        self, data_dir_files: Set[str], new_key: Optional[str] = None
+    ):
         if self.jwt_secret_key is not None:
             return
 
         key_path = os.path.join(self.data_dir, "jwt_secret_key")
-        if os.path.exists(key_path):
-            with open(key_path, "r") as file:
-                key = file.read().strip()
+        if "jwt_secret_key" in data_dir_files:
+            key = _read_secret_file(key_path)
         else:
-            key = secrets.token_hex(32)
-            os.makedirs(self.data_dir, exist_ok=True)
-            with open(key_path, "w") as file:
-                file.write(key)
+            key = new_key or secrets.token_hex(32)
+            # Only the server reads the signing key, so keep it owner-only.
+            if not _write_secret_file(key_path, key, 0o600):
+                key = _read_secret_file(key_path)
 
         self.jwt_secret_key = key
 
@@ -550,6 +539,82 @@ class Config(BaseSettings):
         return self.server_url is None
 
 
+def _parse_gpu_device(gd: dict) -> GPUDeviceInfo:  # noqa: C901
+    name = gd.get("name")
+    index = gd.get("index")
+    device_index = gd.get("device_index", index)
+    device_chip_index = gd.get("device_chip_index", 0)
+    vendor = gd.get("vendor")
+    memory = gd.get("memory")
+    network = gd.get("network")
+    dev_type = gd.get("type") or device_type_from_vendor(vendor)
+
+    if not name:
+        raise ConfigError("GPU device name is required")
+
+    if index is None:
+        raise ConfigError("GPU device index is required")
+
+    if vendor not in _VALID_VENDORS:
+        raise ConfigError(
+            "Unsupported GPU device vendor, supported vendors are: Apple, NVIDIA, 'Moore Threads', Huawei, AMD, Hygon, Iluvatar, Cambricon"
+        )
+
+    if not memory:
+        raise ConfigError("GPU device memory is required")
+    elif not memory.get("total"):
+        raise ConfigError("GPU device memory total is required")
+
+    if network:
+        network_status = network.get("status", "up")
+        if network_status not in ["up", "down"]:
+            raise ConfigError(
+                "GPU device network status is invalid, supported status are: up, down"
+            )
+        network_inet = network.get("inet", None)
+        if network_inet is None:
+            raise ConfigError("GPU device network inet is required")
+        elif not validators.ip(network_inet):
+            raise ConfigError("GPU device network inet is invalid")
+        network_netmask = network.get("netmask", None)
+        if network_netmask and not validators.ip(network_netmask):
+            raise ConfigError("GPU device network netmask is invalid")
+        gateway = network.get("gateway", None)
+        if gateway and not validators.ip(gateway):
+            raise ConfigError("GPU device network gateway is invalid")
+
+    if dev_type not in _VALID_DEVICE_TYPES:
+        raise ConfigError(
+            "Unsupported GPU type, supported type are: cuda, musa, npu, mps, rocm, dcu, corex, mlu"
+        )
+
+    return GPUDeviceInfo(
+        index=index,
+        device_index=device_index,
+        device_chip_index=device_chip_index,
+        name=name,
+        vendor=vendor,
+        memory=MemoryInfo(
+            total=memory.get("total"),
+            is_unified_memory=memory.get("is_unified_memory", False),
+        ),
+        network=(
+            None
+            if not network
+            else GPUNetworkInfo(
+                status=network.get("status", "up"),
+                inet=network.get("inet"),
+                netmask=network.get("netmask", ""),
+                mac=network.get("mac", ""),
+                gateway=network.get("gateway", ""),
+                iface=network.get("iface", None),
+                mtu=network.get("mtu", None),
+            )
+        ),
+        type=dev_type,
+    )
+
+
 def get_global_config() -> Config:
     return _config
 
@@ -0,0 +1,279 @@
+import os
+import stat
+
+import pytest
+
+from gpustack.config import config as config_module
+from gpustack.config.config import Config, ConfigError
+
+
+def test_worker_without_token_creates_no_dirs(tmp_path):
+    data_dir = tmp_path / "data"
+
+    with pytest.raises(ConfigError, match="Token is required"):
+        Config(data_dir=str(data_dir), server_url="http://server")
+
+    assert not data_dir.exists()
+
+
+def test_invalid_database_url_creates_no_dirs(tmp_path):
+    data_dir = tmp_path / "data"
+
+    with pytest.raises(ConfigError, match="Unsupported database scheme"):
+        Config(data_dir=str(data_dir), token="t", database_url="oracle://db")
+
+    assert not data_dir.exists()
+
+
+def test_given_secrets_draw_no_random_bytes(monkeypatch, tmp_path):
+    def fail(*args, **kwargs):
+        raise AssertionError("random bytes drawn for a given secret")
+
+    monkeypatch.setattr(config_module.secrets, "token_bytes", fail)
+    monkeypatch.setattr(config_module.secrets, "token_hex", fail)
+
+    cfg = Config(data_dir=str(tmp_path), token="t", jwt_secret_key="k")
+
+    assert (cfg.token, cfg.jwt_secret_key) == ("t", "k")
+
+
+def test_first_run_draws_random_bytes_once(monkeypatch, tmp_path):
+    calls = []
+    token_bytes = config_module.secrets.token_bytes
+
+    def record(n):
+        calls.append(n)
+        return token_bytes(n)
+
+    monkeypatch.setattr(config_module.secrets, "token_bytes", record)
+
+    cfg = Config(data_dir=str(tmp_path))
+
+    assert calls == [48]
+    assert len(cfg.token) == 32
+    assert len(cfg.jwt_secret_key) == 64
+
+
+def enable_validation(monkeypatch):
+    # Config validation is skipped under pytest. pytest sets this variable
+    # again for each test phase, so unset it from the test body.
+    monkeypatch.delenv("PYTEST_CURRENT_TEST")
+
+
+def test_validator_error_is_config_error(monkeypatch, tmp_path):
+    enable_validation(monkeypatch)
+    with pytest.raises(ConfigError) as exc_info:
+        Config(data_dir=str(tmp_path), token="t", service_port_range="2-1")
+
+    assert type(exc_info.value) is ConfigError
+    assert str(exc_info.value) == "Invalid port range: 2 > 1"
+
+
+def test_init_error_is_config_error(tmp_path):
+    with pytest.raises(ConfigError) as exc_info:
+        Config(data_dir=str(tmp_path), server_url="http://server")
+
+    assert type(exc_info.value) is ConfigError
+    assert str(exc_info.value) == "Token is required when running as a worker"
+
+
+@pytest.mark.parametrize(
+    "resources, message",
+    [
+        (
+            {"filesystem": [{"mount_point": "/", "mount_from": "/dev/sda1"}]},
+            "Filesystem name is required",
+        ),
+        ({"os": {"name": "Ubuntu"}}, "OS version is required"),
+        (
+            {"kernel": {"name": "Linux", "version": "#1 SMP"}},
+            "Kernel release is required",
+        ),
+        ({"uptime": {"boot_time": "2025-01-01T00:00:00"}}, "Uptime is required"),
+    ],
+)
+def test_invalid_system_resources(monkeypatch, tmp_path, resources, message):
+    enable_validation(monkeypatch)
+
+    with pytest.raises(ConfigError, match=message):
+        Config(data_dir=str(tmp_path), token="t", resources=resources)
+
+
+def test_url_trailing_slashes_are_stripped(monkeypatch, tmp_path):
+    enable_validation(monkeypatch)
+    cfg = Config(
+        data_dir=str(tmp_path),
+        token="t",
+        server_url="http://server:80//",
+        ollama_library_base_url="https://registry.example.com/",
+    )
+
+    assert cfg.server_url == "http://server:80"
+    assert cfg.ollama_library_base_url == "https://registry.example.com"
+
+
+@pytest.mark.parametrize(
+    "field, message",
+    [
+        ("server_url", "Invalid server URL."),
+        ("ollama_library_base_url", "Invalid Ollama library base URL."),
+    ],
+)
+def test_invalid_url(monkeypatch, tmp_path, field, message):
+    enable_validation(monkeypatch)
+    with pytest.raises(ConfigError) as exc_info:
+        Config(data_dir=str(tmp_path), token="t", **{field: "not-a-url/"})
+
+    assert str(exc_info.value) == message
+
+
+def test_url_validation_skipped_under_pytest(tmp_path):
+    cfg = Config(data_dir=str(tmp_path), token="t", server_url="not-a-url/")
+
+    assert cfg.server_url == "not-a-url/"
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX file modes")
+def test_secret_files_created_with_modes(tmp_path):
+    umask = os.umask(0o022)
+    try:
+        cfg = Config(data_dir=str(tmp_path))
+    finally:
+        os.umask(umask)
+
+    token_path = tmp_path / "token"
+    key_path = tmp_path / "jwt_secret_key"
+    assert token_path.read_text() == cfg.token + "\n"
+    assert key_path.read_text() == cfg.jwt_secret_key
+    assert stat.S_IMODE(token_path.stat().st_mode) == 0o644
+    assert stat.S_IMODE(key_path.stat().st_mode) == 0o600
+    assert sorted(os.listdir(tmp_path)) == [
+        "bin",
+        "cache",
+        "jwt_secret_key",
+        "log",
+        "token",
+    ]
+
+
+def test_existing_secret_files_are_read(tmp_path):
+    (tmp_path / "token").write_text("existing-token\n")
+    (tmp_path / "jwt_secret_key").write_text("existing-key")
+
+    cfg = Config(data_dir=str(tmp_path))
+
+    assert cfg.token == "existing-token"
+    assert cfg.jwt_secret_key == "existing-key"
+    assert (tmp_path / "token").read_text() == "existing-token\n"
+
+
+def test_secret_file_created_after_listing_is_read(tmp_path):
+    cfg = Config(data_dir=str(tmp_path), token="t", jwt_secret_key="k")
+    cfg.token = None
+    (tmp_path / "token").write_text("raced-token\n")
+
+    # The listing predates the file, as if another process just created it.
+    cfg.prepare_token(set())
+
+    assert cfg.token == "raced-token"
+    assert (tmp_path / "token").read_text() == "raced-token\n"
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_empty_secret_file_is_an_error(tmp_path):
+    (tmp_path / "jwt_secret_key").write_text("")
+
+    with pytest.raises(ConfigError, match="is empty"):
+        Config(data_dir=str(tmp_path))
+
+
+def test_server_prepares_secret_files(tmp_path):
+    cfg = Config(data_dir=str(tmp_path))
+
+    assert cfg.token and cfg.jwt_secret_key
+    assert {"token", "jwt_secret_key"} <= set(os.listdir(tmp_path))
+
+    again = Config(data_dir=str(tmp_path))
+    assert (again.token, again.jwt_secret_key) == (cfg.token, cfg.jwt_secret_key)
+
+
+def test_worker_skips_secret_files(tmp_path):
+    cfg = Config(data_dir=str(tmp_path), server_url="http://server", token="t")
+
+    assert cfg.token == "t"
+    assert cfg.jwt_secret_key is None
+    assert not {"token", "jwt_secret_key"} & set(os.listdir(tmp_path))
+
+
+def test_server_lists_data_dir_once(monkeypatch, tmp_path):
+    (tmp_path / "token").write_text("existing-token\n")
+    scanned = []
+    scandir = os.scandir
+
+    def record(path):
+        scanned.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(config_module.os, "scandir", record)
+
+    cfg = Config(data_dir=str(tmp_path))
+
+    assert scanned == [str(tmp_path)]
+    assert cfg.token == "existing-token"
+    assert (tmp_path / "jwt_secret_key").read_text() == cfg.jwt_secret_key
+
+
+def gpu_device(**overrides):
+    device = {
+        "name": "NVIDIA A100",
+        "vendor": "NVIDIA",
+        "index": 0,
+        "memory": {"total": 85899345920},
+    }
+    device.update(overrides)
+    return device
+
+
+@pytest.mark.parametrize(
+    "overrides, message",
+    [
+        ({"name": None}, "GPU device name is required"),
+        ({"index": None}, "GPU device index is required"),
+        ({"vendor": "Unknown"}, "Unsupported GPU device vendor"),
+        ({"memory": None}, "GPU device memory is required"),
+        ({"memory": {"total": 0}}, "GPU device memory total is required"),
+        ({"network": {"status": "unknown"}}, "network status is invalid"),
+        ({"network": {"status": "up"}}, "network inet is required"),
+        ({"network": {"inet": "not-an-ip"}}, "network inet is invalid"),
+        ({"type": "tpu"}, "Unsupported GPU type"),
+    ],
+)
+def test_invalid_gpu_devices(monkeypatch, tmp_path, overrides, message):
+    enable_validation(monkeypatch)
+    resources = {"gpu_devices": [gpu_device(**overrides)]}
+
+    with pytest.raises(ConfigError, match=message):
+        Config(data_dir=str(tmp_path), token="t", resources=resources)
+
+
+def test_valid_resources(monkeypatch, tmp_path):
+    enable_validation(monkeypatch)
+    resources = {
+        "gpu_devices": [
+            gpu_device(
+                vendor="Huawei",
+                network={"inet": "29.17.45.215", "gateway": "29.17.0.1"},
+            )
+        ],
+        "cpu": {"total": 8},
+        "os": {"name": "Ubuntu", "version": "22.04"},
+    }
+
+    cfg = Config(data_dir=str(tmp_path), token="t", resources=resources)
+
+    (device,) = cfg.get_gpu_devices()
+    assert device.type == "npu"
+    assert device.network.inet == "29.17.45.215"
+    system_info = cfg.get_system_info()
+    assert system_info.cpu.total == 8
+    assert system_info.os.version == "22.04"